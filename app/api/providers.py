@@ -0,0 +1,24 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import get_async_db
+from schemas import ProvidersSearchResponse
+from services.search_service import search_providers
+
+router = APIRouter()
+
+
+@router.get("/providers", response_model=ProvidersSearchResponse)
+async def get_providers(
+    drg: Optional[str] = None,
+    zip: Optional[str] = None,
+    radius_km: float = 25.0,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Search hospitals by DRG code or description, optionally near a ZIP code"""
+    return await search_providers(
+        db, drg=drg, zip_code=zip, radius_km=radius_km, limit=limit
+    )
@@ -0,0 +1,151 @@
+# app/crud.py
+import re
+from sqlalchemy import func, null, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import column, table
+from typing import Any, Dict, List, Optional, Tuple
+
+# Bounds for model-generated queries: rows returned and time spent in Postgres
+MAX_QUERY_ROWS = 100
+QUERY_TIMEOUT_MS = 3000
+
+# Matches the :name binds text() looks for (same pattern SQLAlchemy uses)
+_BIND_RE = re.compile(r"(?<![:\w\\]):(\w+)(?!:)")
+
+EARTH_RADIUS_KM = 6371.0
+
+# The ETL-loaded tables (see etl.py); lightweight table constructs, since no
+# mapped classes exist for them
+providers_table = table(
+    "providers",
+    column("provider_id"),
+    column("provider_name"),
+    column("provider_city"),
+    column("provider_state"),
+    column("provider_zip_code"),
+    column("latitude"),
+    column("longitude"),
+    column("ms_drg_definition"),
+    column("total_discharges"),
+    column("average_covered_charges"),
+    column("average_total_payments"),
+    column("average_medicare_payments"),
+)
+ratings_table = table("ratings", column("provider_id"), column("rating"))
+
+
+def _drg_filter(drg: Optional[str]) -> list:
+    if not drg:
+        return []
+    return [providers_table.c.ms_drg_definition.ilike(f"%{drg}%")]
+
+
+async def get_providers_by_drg_and_location(
+    db: AsyncSession,
+    drg: Optional[str] = None,
+    latitude: Optional[float] = None,
+    longitude: Optional[float] = None,
+    radius_km: Optional[float] = 25.0,
+    limit: int = 20,
+) -> List[Tuple[Any, Optional[float], float]]:
+    """
+    Find providers by DRG and, when coordinates are given, within radius_km of
+    them. Returns (provider row, distance in km or None, average rating or 0)
+    """
+    p = providers_table
+    avg_ratings = (
+        select(
+            ratings_table.c.provider_id,
+            func.avg(ratings_table.c.rating).label("avg_rating"),
+        )
+        .group_by(ratings_table.c.provider_id)
+        .subquery()
+    )
+    avg_rating = func.coalesce(avg_ratings.c.avg_rating, 0).label("average_rating")
+
+    conditions = _drg_filter(drg)
+    if latitude is not None and longitude is not None:
+        # Great-circle distance; least() guards acos against rounding past 1
+        distance = EARTH_RADIUS_KM * func.acos(
+            func.least(
+                1.0,
+                func.cos(func.radians(latitude))
+                * func.cos(func.radians(p.c.latitude))
+                * func.cos(func.radians(p.c.longitude) - func.radians(longitude))
+                + func.sin(func.radians(latitude))
+                * func.sin(func.radians(p.c.latitude)),
+            )
+        )
+        if radius_km is not None:
+            conditions.append(distance <= radius_km)
+        order_by = distance
+    else:
+        distance = null()
+        order_by = p.c.average_covered_charges
+
+    stmt = (
+        select(p, distance.label("distance_km"), avg_rating)
+        .outerjoin(avg_ratings, avg_ratings.c.provider_id == p.c.provider_id)
+        .where(*conditions)
+        .order_by(order_by)
+        .limit(limit)
+    )
+    result = await db.execute(stmt)
+    return [(row, row.distance_km, row.average_rating) for row in result]
+
+
+async def get_provider_count(db: AsyncSession, drg: Optional[str] = None) -> int:
+    """Count provider rows, optionally only those matching a DRG"""
+    stmt = (
+        select(func.count())
+        .select_from(providers_table)
+        .where(*_drg_filter(drg))
+    )
+    return (await db.execute(stmt)).scalar_one()
+
+
+def cap_generated_query(
+    sql_query: str, params: Optional[Dict[str, Any]] = None
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Wrap a generated query in a row cap and escape any :name that isn't one
+    of its parameters (e.g. inside a string literal), so text() doesn't
+    mistake it for a bind
+    """
+    params = dict(params or {})
+
+    def escape_unknown(match: re.Match) -> str:
+        bind = match.group(0)
+        return bind if match.group(1) in params else "\\" + bind
+
+    sql_query = _BIND_RE.sub(escape_unknown, sql_query)
+    # Always capped: a LIMIT of the query's own may be huge or sit in a
+    # subquery, and the wrapper costs nothing when the inner limit is smaller
+    sql_query = (
+        f"SELECT * FROM ({sql_query}) AS generated_query LIMIT :generated_query_limit"
+    )
+    params["generated_query_limit"] = MAX_QUERY_ROWS
+    return sql_query, params
+
+
+async def execute_custom_query(
+    db: AsyncSession, sql_query: str, params: Optional[Dict[str, Any]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Run a generated SQL query in a read-only, time-bounded transaction and
+    return rows as dictionaries
+    """
+    sql_query, params = cap_generated_query(sql_query, params)
+
+    # A transaction of its own on a fresh connection, so READ ONLY and the
+    # timeout hold whatever the caller's session has already run; both are
+    # transaction-scoped, so they can't leak onto other clients sharing the
+    # server connection behind PgBouncer
+    async with db.bind.connect() as conn:
+        conn = await conn.execution_options(postgresql_readonly=True)
+        async with conn.begin():
+            await conn.execute(
+                text(f"SET LOCAL statement_timeout = {QUERY_TIMEOUT_MS}")
+            )
+            result = await conn.execute(text(sql_query), params)
+            return [dict(row) for row in result.mappings()]
@@ -1,46 +1,184 @@
-from fastapi import FastAPI, Depends, UploadFile, File
+from contextlib import asynccontextmanager
+import csv
+import os
+from fastapi import FastAPI, Depends, HTTPException, UploadFile, File
+from fastapi.responses import ORJSONResponse
 import pandas as pd
 from sqlalchemy.orm import Session
-from sqlalchemy import text
-from database import SessionLocal, engine, Base
+from sqlalchemy import Numeric, SmallInteger, String, insert
+from database import DATABASE_URL, async_engine, engine, get_db, init_db
 from models import ProviderData
+from api.providers import router as providers_router
 
-Base.metadata.create_all(bind=engine)
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import adbc_driver_postgresql.dbapi as adbc_postgresql
+except ImportError:  # Optional binary-COPY path, only used when selected
+    adbc_postgresql = None
 
-app = FastAPI()
+# CSV ingest path: "copy" (text COPY, the default), "adbc" (binary COPY via
+# Arrow; opt-in, as decimal128 -> NUMERIC ingest is unverified against the
+# pinned driver) or "insert" (batched INSERTs, for drivers without COPY)
+UPLOAD_BACKENDS = ("copy", "adbc", "insert")
+UPLOAD_BACKEND = os.getenv("UPLOAD_BACKEND", "copy")
+if UPLOAD_BACKEND not in UPLOAD_BACKENDS:
+    raise ValueError(
+        f"UPLOAD_BACKEND must be one of {', '.join(UPLOAD_BACKENDS)}, "
+        f"not {UPLOAD_BACKEND!r}"
+    )
 
 
-def get_db():
-    db = SessionLocal()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    init_db()
+    yield
+    engine.dispose()
+    await async_engine.dispose()
+
+
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+app.include_router(providers_router)
+
+# The CSV header every upload must have, in order: COPY maps columns by position
+PROVIDER_DATA_HEADER = [
+    attribute
+    for attribute in ProviderData.__mapper__.columns.keys()
+    if attribute != "id"
+]
+PROVIDER_DATA_COLUMNS = [
+    column.name for column in ProviderData.__table__.columns if column.name != "id"
+]
+COPY_SQL = (
+    f"COPY provider_data ({', '.join(PROVIDER_DATA_COLUMNS)}) "
+    "FROM STDIN WITH (FORMAT CSV, HEADER TRUE, ENCODING 'LATIN1')"
+)
+# Read code-like columns (CCN, ZIP, DRG) as text so leading zeros survive
+PROVIDER_DATA_DTYPES = {
+    attribute: str
+    for attribute, column in ProviderData.__mapper__.columns.items()
+    if isinstance(column.type, String)
+}
+CSV_CHUNK_ROWS = 5_000
+COMMIT_EVERY_CHUNKS = 20
+INSERT_STMT = insert(ProviderData)
+
+
+def read_provider_csv_arrow(file) -> "pa.RecordBatchReader":
+    # Stream the upload as Arrow record batches typed like provider_data,
+    # because binary COPY sends values in the target column's wire format;
+    # only one block of the CSV is held in memory at a time
+    column_types = {}
+    for attribute, column in ProviderData.__mapper__.columns.items():
+        if isinstance(column.type, String):
+            column_types[attribute] = pa.string()
+        elif isinstance(column.type, SmallInteger):
+            column_types[attribute] = pa.int16()
+        elif isinstance(column.type, Numeric):
+            column_types[attribute] = pa.float64()
+    reader = pa_csv.open_csv(
+        file,
+        read_options=pa_csv.ReadOptions(encoding="latin-1"),
+        convert_options=pa_csv.ConvertOptions(column_types=column_types),
+    )
+
+    columns = ProviderData.__mapper__.columns
+    fields = []
+    for field in reader.schema:
+        column = columns[field.name]
+        field_type = field.type
+        if isinstance(column.type, Numeric):
+            # Rounds to the column's scale, as Postgres would on a text COPY
+            field_type = pa.decimal128(column.type.precision, column.type.scale)
+        fields.append(pa.field(column.name, field_type))
+    schema = pa.schema(fields)
+
+    def cast_batches():
+        for batch in reader:
+            yield pa.RecordBatch.from_arrays(
+                [
+                    array.cast(field.type)
+                    for array, field in zip(batch.columns, schema)
+                ],
+                schema=schema,
+            )
+
+    return pa.RecordBatchReader.from_batches(schema, cast_batches())
+
+
+def adbc_copy_csv(file) -> int:
+    # ADBC ingests the Arrow batches with a binary COPY, skipping text parsing.
+    # Each upload opens its own connection: ADBC connections sit outside the
+    # SQLAlchemy pool, and one connect is negligible next to a bulk load
+    batches = read_provider_csv_arrow(file)
+    with adbc_postgresql.connect(DATABASE_URL) as conn:
+        with conn.cursor() as cursor:
+            row_count = cursor.adbc_ingest("provider_data", batches, mode="append")
+        conn.commit()
+    return row_count
+
+
+def copy_csv(file) -> int:
+    # Stream the upload straight into COPY rather than issuing one INSERT per row
+    conn = engine.raw_connection()
     try:
-        yield db
+        with conn.cursor() as cursor:
+            cursor.copy_expert(COPY_SQL, file)
+            row_count = cursor.rowcount
+        conn.commit()
     finally:
-        db.close()
+        conn.close()
+    return row_count
+
+
+def insert_csv(file, db: Session) -> int:
+    # Fallback for drivers without COPY; the engine batches the parameter sets
+    reader = pd.read_csv(
+        file,
+        encoding="latin-1",
+        dtype=PROVIDER_DATA_DTYPES,
+        chunksize=CSV_CHUNK_ROWS,
+    )
+    row_count = 0
+    for chunk_number, chunk in enumerate(reader, 1):
+        records = chunk.astype(object).where(chunk.notna(), None)
+        db.execute(INSERT_STMT, records.to_dict(orient="records"))
+        row_count += len(chunk)
+        # Commit periodically so a huge upload doesn't pile up in one transaction
+        if chunk_number % COMMIT_EVERY_CHUNKS == 0:
+            db.commit()
+    db.commit()
+    return row_count
+
+
+def validate_csv_header(file) -> None:
+    """Reject uploads whose header isn't exactly PROVIDER_DATA_HEADER"""
+    header_line = file.readline().decode("latin-1")
+    file.seek(0)
+    header = next(csv.reader([header_line]), [])
+    if header == PROVIDER_DATA_HEADER:
+        return
+
+    missing = [column for column in PROVIDER_DATA_HEADER if column not in header]
+    unexpected = [column for column in header if column not in PROVIDER_DATA_HEADER]
+    if missing or unexpected:
+        detail = (
+            f"Unexpected CSV header; missing columns: {missing}, "
+            f"unknown columns: {unexpected}"
+        )
+    else:
+        detail = f"CSV columns must be in this order: {PROVIDER_DATA_HEADER}"
+    raise HTTPException(status_code=400, detail=detail)
 
 
 @app.post("/upload-csv/")
 def upload_csv(file: UploadFile = File(...), db: Session = Depends(get_db)):
-    df = pd.read_csv(file.file, encoding="latin-1")
-    for _, row in df.iterrows():
-        db.execute(
-            text(
-                """
-                INSERT INTO provider_data (
-                    Rndrng_Prvdr_CCN, Rndrng_Prvdr_Org_Name, Rndrng_Prvdr_City,
-                    Rndrng_Prvdr_St, Rndrng_Prvdr_State_FIPS, Rndrng_Prvdr_Zip5,
-                    Rndrng_Prvdr_State_Abrvtn, Rndrng_Prvdr_RUCA, Rndrng_Prvdr_RUCA_Desc,
-                    DRG_Cd, DRG_Desc, Tot_Dschrgs, Avg_Submtd_Cvrd_Chrg, Avg_Tot_Pymt_Amt,
-                    Avg_Mdcr_Pymt_Amt
-                ) VALUES (
-                    :Rndrng_Prvdr_CCN, :Rndrng_Prvdr_Org_Name, :Rndrng_Prvdr_City,
-                    :Rndrng_Prvdr_St, :Rndrng_Prvdr_State_FIPS, :Rndrng_Prvdr_Zip5,
-                    :Rndrng_Prvdr_State_Abrvtn, :Rndrng_Prvdr_RUCA, :Rndrng_Prvdr_RUCA_Desc,
-                    :DRG_Cd, :DRG_Desc, :Tot_Dschrgs, :Avg_Submtd_Cvrd_Chrg, :Avg_Tot_Pymt_Amt,
-                    :Avg_Mdcr_Pymt_Amt
-                )
-                """
-            ),
-            row.to_dict(),
-        )
-    db.commit()
-    return {"status": f"{len(df)} rows inserted successfully"}
+    validate_csv_header(file.file)
+    use_adbc = UPLOAD_BACKEND == "adbc" and adbc_postgresql is not None
+    if use_adbc and engine.dialect.name == "postgresql":
+        row_count = adbc_copy_csv(file.file)
+    elif UPLOAD_BACKEND != "insert" and engine.dialect.driver == "psycopg2":
+        row_count = copy_csv(file.file)
+    else:
+        row_count = insert_csv(file.file, db)
+    return {"status": f"{row_count} rows inserted successfully"}
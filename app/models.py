@@ -1,23 +1,104 @@
-from sqlalchemy import Column, Integer, String, Float
+from sqlalchemy import (
+    CHAR,
+    DDL,
+    Column,
+    Float,
+    Index,
+    Integer,
+    Numeric,
+    SmallInteger,
+    String,
+    Text,
+    UniqueConstraint,
+    event,
+)
 from database import Base
 
 
 class ProviderData(Base):
     __tablename__ = "provider_data"
+    __table_args__ = (
+        # Trigram GIN index so ILIKE '%keyword%' on the DRG description can use it
+        Index(
+            "ix_provider_data_drg_desc_trgm",
+            "drg_desc",
+            postgresql_using="gin",
+            postgresql_ops={"drg_desc": "gin_trgm_ops"},
+        ),
+        Index("ix_provider_data_zip5", "rndrng_prvdr_zip5"),
+        # Cost-by-DRG-by-state lookups
+        Index("ix_provider_data_drg_state", "drg_cd", "rndrng_prvdr_state_abrvtn"),
+    )
 
+    # Attributes keep the CMS CSV header names; the database columns are the
+    # lowercase names Postgres folds them to (see data/init.sql)
     id = Column(Integer, primary_key=True, index=True)
-    Rndrng_Prvdr_CCN = Column(String, index=True)
-    Rndrng_Prvdr_Org_Name = Column(String)
-    Rndrng_Prvdr_City = Column(String)
-    Rndrng_Prvdr_St = Column(String)
-    Rndrng_Prvdr_State_FIPS = Column(String)
-    Rndrng_Prvdr_Zip5 = Column(String)
-    Rndrng_Prvdr_State_Abrvtn = Column(String)
-    Rndrng_Prvdr_RUCA = Column(String)
-    Rndrng_Prvdr_RUCA_Desc = Column(String)
-    DRG_Cd = Column(String)
-    DRG_Desc = Column(String)
-    Tot_Dschrgs = Column(Integer)
-    Avg_Submtd_Cvrd_Chrg = Column(Float)
-    Avg_Tot_Pymt_Amt = Column(Float)
-    Avg_Mdcr_Pymt_Amt = Column(Float)
+    Rndrng_Prvdr_CCN = Column("rndrng_prvdr_ccn", String, index=True)
+    Rndrng_Prvdr_Org_Name = Column("rndrng_prvdr_org_name", String)
+    Rndrng_Prvdr_City = Column("rndrng_prvdr_city", String)
+    Rndrng_Prvdr_St = Column("rndrng_prvdr_st", String)
+    Rndrng_Prvdr_State_FIPS = Column("rndrng_prvdr_state_fips", String)
+    Rndrng_Prvdr_Zip5 = Column("rndrng_prvdr_zip5", CHAR(5))
+    Rndrng_Prvdr_State_Abrvtn = Column("rndrng_prvdr_state_abrvtn", String)
+    Rndrng_Prvdr_RUCA = Column("rndrng_prvdr_ruca", String)
+    Rndrng_Prvdr_RUCA_Desc = Column("rndrng_prvdr_ruca_desc", String)
+    DRG_Cd = Column("drg_cd", CHAR(3))
+    DRG_Desc = Column("drg_desc", String)
+    Tot_Dschrgs = Column("tot_dschrgs", SmallInteger)
+    Avg_Submtd_Cvrd_Chrg = Column("avg_submtd_cvrd_chrg", Numeric(12, 2))
+    Avg_Tot_Pymt_Amt = Column("avg_tot_pymt_amt", Numeric(12, 2))
+    Avg_Mdcr_Pymt_Amt = Column("avg_mdcr_pymt_amt", Numeric(12, 2))
+
+
+
+# One provider's costs for one DRG, loaded by etl.py
+class Provider(Base):
+    __tablename__ = "providers"
+    __table_args__ = (
+        # One row per provider and DRG; the ETL's ON CONFLICT targets this
+        UniqueConstraint(
+            "provider_id", "ms_drg_definition", name="uq_providers_provider_drg"
+        ),
+        Index("ix_providers_lat_lon", "latitude", "longitude"),
+        # The search and generated queries match DRGs with ILIKE
+        Index(
+            "ix_providers_drg_trgm",
+            "ms_drg_definition",
+            postgresql_using="gin",
+            postgresql_ops={"ms_drg_definition": "gin_trgm_ops"},
+        ),
+    )
+
+    id = Column(Integer, primary_key=True)
+    provider_id = Column(String(10), nullable=False, index=True)
+    provider_name = Column(String(255), nullable=False)
+    provider_city = Column(String(100))
+    provider_state = Column(String(2))
+    provider_zip_code = Column(String(10), index=True)
+    latitude = Column(Float)
+    longitude = Column(Float)
+    ms_drg_definition = Column(Text, nullable=False)
+    total_discharges = Column(Integer)
+    average_covered_charges = Column(Float)
+    average_total_payments = Column(Float)
+    average_medicare_payments = Column(Float)
+
+
+# Mock quality ratings (1-10), several per provider, loaded by etl.py
+class Rating(Base):
+    __tablename__ = "ratings"
+
+    id = Column(Integer, primary_key=True)
+    provider_id = Column(String(10), nullable=False, index=True)
+    rating = Column(Float, nullable=False)
+
+
+# gin_trgm_ops comes from pg_trgm, which must exist before the tables' indexes
+for _trgm_table in (ProviderData.__table__, Provider.__table__):
+    event.listen(
+        _trgm_table,
+        "before_create",
+        DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(
+            dialect="postgresql"
+        ),
+    )
@@ -0,0 +1,23 @@
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class ProviderResponse(BaseModel):
+    provider_id: str
+    provider_name: str
+    provider_city: Optional[str] = None
+    provider_state: Optional[str] = None
+    provider_zip_code: Optional[str] = None
+    ms_drg_definition: str
+    total_discharges: Optional[int] = None
+    average_covered_charges: Optional[float] = None
+    average_total_payments: Optional[float] = None
+    average_medicare_payments: Optional[float] = None
+    distance_km: Optional[float] = None
+    average_rating: Optional[float] = None
+
+
+class ProvidersSearchResponse(BaseModel):
+    hospitals: List[ProviderResponse]
+    total_count: int
@@ -1,18 +1,105 @@
 # app/services/openai_service.py
 import os
-import json
+import asyncio
+import orjson
 import re
+import hashlib
+import heapq
+import time
+from collections import OrderedDict
 from openai import AsyncOpenAI
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import logging
-from ..crud import execute_custom_query
+from crud import execute_custom_query
 
 logger = logging.getLogger(__name__)
 
 # Initialize OpenAI client
 client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
+# First SELECT statement in the model output, up to its terminating ';' (the
+# prompt requires one), a closing code fence or the end; blank lines inside a
+# query (CTEs, spaced-out UNIONs) don't end it
+_SQL_RE = re.compile(r"SELECT\b.*?(?=;|```|\Z)", re.IGNORECASE | re.DOTALL)
+# Characters that can complete one of _SQL_RE's terminators
+_SQL_END_CHARS = frozenset(";`")
+# Bind-parameter values the model lists ahead of its query
+_PARAMS_RE = re.compile(r"PARAMS:\s*(\{.*?\})", re.DOTALL)
+_DRG_CODE_RE = re.compile(r"\b(?:MS-)?DRG\s*#?\s*(\d{3})\b", re.IGNORECASE)
+_PUNCTUATION_RE = re.compile(r"[^\w\s]")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+class TTLCache:
+    """Small in-process LRU cache whose entries expire after a fixed TTL"""
+
+    def __init__(self, maxsize: int, ttl_seconds: float):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict = OrderedDict()
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
+# Model answers are stable for a day; query results only briefly, since the
+# same SQL can be generated for questions asked well apart
+classification_cache = TTLCache(maxsize=2048, ttl_seconds=24 * 60 * 60)
+query_result_cache = TTLCache(maxsize=512, ttl_seconds=5 * 60)
+
+
+def question_cache_key(question: str) -> str:
+    """Hash a question after lowercasing and dropping punctuation/extra spaces"""
+    normalized = _PUNCTUATION_RE.sub("", question.lower())
+    normalized = _WHITESPACE_RE.sub(" ", normalized).strip()
+    return hashlib.sha256(normalized.encode()).hexdigest()
+
+
+def sql_cache_key(sql_query: str, params: Dict[str, Any]) -> str:
+    """Hash a SQL query (whitespace collapsed) together with its bind parameters"""
+    normalized = _WHITESPACE_RE.sub(" ", sql_query).strip().encode()
+    normalized += orjson.dumps(params, option=orjson.OPT_SORT_KEYS)
+    return hashlib.sha256(normalized).hexdigest()
+
+
+# Canonical query for "cheapest hospitals for DRG nnn" questions, which is
+# started speculatively while the model is still answering
+CHEAPEST_BY_DRG_SQL = """SELECT provider_name, provider_city, provider_state, average_covered_charges
+FROM providers
+WHERE ms_drg_definition LIKE :drg_prefix
+ORDER BY average_covered_charges
+LIMIT 10"""
+
+
+def normalize_sql(sql_query: str) -> str:
+    """Lowercase a query, collapse whitespace and drop the trailing semicolon"""
+    normalized = _WHITESPACE_RE.sub(" ", sql_query).strip().rstrip(";")
+    return normalized.strip().lower()
+
+
+# Shape of a normalized cheapest-for-a-DRG query: plain columns from providers,
+# only a LIKE on the DRG definition, cheapest first, ten rows
+_CHEAPEST_BY_DRG_SHAPE_RE = re.compile(
+    r"select (?P<columns>\w+(?:, \w+)*) from providers"
+    r" where ms_drg_definition i?like :(?P<param>\w+)"
+    r" order by average_covered_charges(?: asc)? limit 10"
+)
+
 SYSTEM_PROMPT = """You are a helpful assistant for a healthcare cost database. You can answer questions about hospital procedures, costs, and ratings.
 
 Available database tables:
@@ -26,16 +113,61 @@ Guidelines:
 4. When generating SQL, use JOIN operations to combine provider and rating data when needed
 5. Always include provider_name and relevant cost/rating information in results
 6. Limit results to 10 unless specifically asked for more
+7. Never inline literal values in SQL; use named parameters like :keyword and, before the query, give their values on one line as PARAMS: {"keyword": "%knee%"}
+8. Always end a SQL query with a semicolon
 
 Example SQL patterns:
-- Cost queries: SELECT provider_name, average_covered_charges FROM providers WHERE ms_drg_definition ILIKE '%keyword%'
-- Rating queries: SELECT p.provider_name, AVG(r.rating) FROM providers p JOIN ratings r ON p.provider_id = r.provider_id WHERE p.ms_drg_definition ILIKE '%keyword%' GROUP BY p.provider_name
+- Cost queries: SELECT provider_name, average_covered_charges FROM providers WHERE ms_drg_definition ILIKE :keyword
+- Rating queries: SELECT p.provider_name, AVG(r.rating) FROM providers p JOIN ratings r ON p.provider_id = r.provider_id WHERE p.ms_drg_definition ILIKE :keyword GROUP BY p.provider_name
 - Location queries: Include provider_city, provider_state in results
+- Cheapest hospitals for a DRG code (e.g. DRG 470): PARAMS: {"drg_prefix": "470%"} then {cheapest_by_drg_sql};
 
 Respond with either:
 - A SQL query if the question requires database lookup
 - A direct answer if it's general healthcare information
-- "OUT_OF_SCOPE" if the question is not healthcare-related"""
+- "OUT_OF_SCOPE" if the question is not healthcare-related""".replace(
+    # Taught verbatim so the model's answer can be matched to the speculation
+    "{cheapest_by_drg_sql}",
+    _WHITESPACE_RE.sub(" ", CHEAPEST_BY_DRG_SQL),
+)
+
+
+async def stream_until_actionable(question: str) -> str:
+    """
+    Stream the model output and stop as soon as it is actionable: an
+    OUT_OF_SCOPE marker or a SELECT statement that has been terminated
+    """
+    stream = await client.chat.completions.create(
+        model="gpt-3.5-turbo",
+        messages=[
+            {"role": "system", "content": SYSTEM_PROMPT},
+            {"role": "user", "content": f"Question: {question}"},
+        ],
+        max_tokens=500,
+        temperature=0.1,
+        stream=True,
+    )
+
+    ai_response = ""
+    try:
+        async for chunk in stream:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if not delta:
+                continue
+            ai_response += delta
+
+            if "OUT_OF_SCOPE" in ai_response:
+                break
+            if not _SQL_END_CHARS.isdisjoint(delta):
+                # The match stops short of the end only once a terminator closed it
+                sql_match = _SQL_RE.search(ai_response)
+                if sql_match and sql_match.end() < len(ai_response):
+                    break
+    finally:
+        # Drop the connection so the remaining tokens aren't generated for us
+        await stream.response.aclose()
+
+    return ai_response.strip()
 
 
 async def classify_and_process_query(question: str) -> Dict[str, Any]:
@@ -43,39 +175,33 @@ async def classify_and_process_query(question: str) -> Dict[str, Any]:
     Use OpenAI to classify the question and generate appropriate response
     """
     try:
-        response = await client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": f"Question: {question}"},
-            ],
-            max_tokens=500,
-            temperature=0.1,
-        )
+        ai_response = await stream_until_actionable(question)
 
-        ai_response = response.choices[0].message.content.strip()
-
-        # Check if it's out of scope
-        if "OUT_OF_SCOPE" in ai_response.upper():
+        # Check if it's out of scope (the prompt asks for this exact token)
+        if "OUT_OF_SCOPE" in ai_response:
             return {
                 "type": "out_of_scope",
                 "response": "I can only help with hospital pricing and quality information. Please ask about medical procedures, costs, or hospital ratings.",
             }
 
         # Check if it contains SQL
-        if "SELECT" in ai_response.upper():
-            sql_match = re.search(
-                r"(SELECT.*?;?)", ai_response, re.IGNORECASE | re.DOTALL
-            )
-            if sql_match:
-                sql_query = sql_match.group(1).strip()
-                if sql_query.endswith(";"):
-                    sql_query = sql_query[:-1]  # Remove trailing semicolon
-                return {
-                    "type": "sql_query",
-                    "sql": sql_query,
-                    "explanation": ai_response,
-                }
+        sql_match = _SQL_RE.search(ai_response)
+        if sql_match:
+            params = {}
+            params_match = _PARAMS_RE.search(ai_response, 0, sql_match.start())
+            if params_match:
+                try:
+                    params = orjson.loads(params_match.group(1))
+                except ValueError:
+                    logger.warning(
+                        f"Ignoring unparseable PARAMS: {params_match.group(1)}"
+                    )
+            return {
+                "type": "sql_query",
+                "sql": sql_match.group(0).strip(),
+                "params": params,
+                "explanation": ai_response,
+            }
 
         # Direct answer
         return {"type": "direct_answer", "response": ai_response}
@@ -88,6 +214,16 @@ async def classify_and_process_query(question: str) -> Dict[str, Any]:
         }
 
 
+# Bound once so the format spec isn't re-parsed for every amount
+_format_money = "{:,.2f}".format
+
+
+def format_location(hospital: Dict[str, Any]) -> str:
+    city = hospital.get("provider_city", "")
+    state = hospital.get("provider_state", "")
+    return f" in {city}, {state}" if city and state else ""
+
+
 def format_query_results(results: list, question: str) -> str:
     """
     Format database query results into a natural language response
@@ -98,100 +234,151 @@ def format_query_results(results: list, question: str) -> str:
     # Determine response format based on question type
     question_lower = question.lower()
 
+    # Every row shares the same columns, so detect the interesting ones once
+    columns = results[0].keys()
+    has_cost = "average_covered_charges" in columns
+    rating_key = next((k for k in columns if "rating" in k.lower()), None)
+    ranking_key = next(
+        (k for k in columns if "rating" in k.lower() or "avg" in k.lower()), None
+    )
+
     if "cheapest" in question_lower or "lowest cost" in question_lower:
         # Sort by cost and show the cheapest options
-        if "average_covered_charges" in results[0]:
-            sorted_results = sorted(
-                results, key=lambda x: float(x.get("average_covered_charges", 0))
-            )
-            top_results = sorted_results[:3]
-            response = (
-                "Based on the data, here are the most cost-effective options:\n\n"
-            )
-            for i, hospital in enumerate(top_results, 1):
+        if has_cost:
+            # Parse each cost once, then select the top 3 without a full sort
+            costed = [
+                (float(x.get("average_covered_charges", 0)), x) for x in results
+            ]
+            top_results = heapq.nsmallest(3, costed, key=lambda pair: pair[0])
+            lines = ["Based on the data, here are the most cost-effective options:", ""]
+            for i, (cost, hospital) in enumerate(top_results, 1):
                 name = hospital.get("provider_name", "Unknown")
-                cost = hospital.get("average_covered_charges", 0)
-                city = hospital.get("provider_city", "")
-                state = hospital.get("provider_state", "")
-                location = f" in {city}, {state}" if city and state else ""
-                response += f"{i}. {name}{location} - ${cost:,.2f}\n"
-            return response
+                location = format_location(hospital)
+                lines.append(f"{i}. {name}{location} - ${_format_money(cost)}")
+            return "\n".join(lines) + "\n"
 
     elif "best rating" in question_lower or "highest rating" in question_lower:
         # Show highest rated hospitals
-        if "avg" in str(results[0]).lower() or "rating" in str(results[0]):
-            rating_key = None
-            for key in results[0].keys():
-                if "rating" in key.lower() or "avg" in key.lower():
-                    rating_key = key
-                    break
-
-            if rating_key:
-                sorted_results = sorted(
-                    results, key=lambda x: float(x.get(rating_key, 0)), reverse=True
-                )
-                top_results = sorted_results[:3]
-                response = "Here are the highest-rated hospitals for your query:\n\n"
-                for i, hospital in enumerate(top_results, 1):
-                    name = hospital.get("provider_name", "Unknown")
-                    rating = hospital.get(rating_key, 0)
-                    city = hospital.get("provider_city", "")
-                    state = hospital.get("provider_state", "")
-                    location = f" in {city}, {state}" if city and state else ""
-                    response += f"{i}. {name}{location} - Rating: {rating:.1f}/10\n"
-                return response
+        if ranking_key:
+            rated = [(float(x.get(ranking_key, 0)), x) for x in results]
+            top_results = heapq.nlargest(3, rated, key=lambda pair: pair[0])
+            lines = ["Here are the highest-rated hospitals for your query:", ""]
+            for i, (rating, hospital) in enumerate(top_results, 1):
+                name = hospital.get("provider_name", "Unknown")
+                location = format_location(hospital)
+                lines.append(f"{i}. {name}{location} - Rating: {rating:.1f}/10")
+            return "\n".join(lines) + "\n"
 
     # Generic response format
     if len(results) == 1:
         hospital = results[0]
         name = hospital.get("provider_name", "Hospital")
-        response = f"Found information for {name}:\n"
+        lines = [f"Found information for {name}:"]
         for key, value in hospital.items():
             if key != "provider_name" and value is not None:
                 formatted_key = key.replace("_", " ").title()
                 if "charges" in key or "payments" in key:
-                    response += f"- {formatted_key}: ${value:,.2f}\n"
+                    lines.append(f"- {formatted_key}: ${_format_money(value)}")
                 elif "rating" in key:
-                    response += f"- {formatted_key}: {value}/10\n"
+                    lines.append(f"- {formatted_key}: {value}/10")
                 else:
-                    response += f"- {formatted_key}: {value}\n"
-        return response
+                    lines.append(f"- {formatted_key}: {value}")
+        return "\n".join(lines) + "\n"
     else:
-        response = f"Found {len(results)} matching hospitals:\n\n"
+        lines = [f"Found {len(results)} matching hospitals:", ""]
         for i, hospital in enumerate(results[:5], 1):  # Limit to 5 for readability
             name = hospital.get("provider_name", "Unknown")
-            city = hospital.get("provider_city", "")
-            state = hospital.get("provider_state", "")
-            location = f" in {city}, {state}" if city and state else ""
+            location = format_location(hospital)
 
             # Add key information
             details = []
-            if "average_covered_charges" in hospital:
-                details.append(f"Cost: ${hospital['average_covered_charges']:,.2f}")
-            if any("rating" in key.lower() for key in hospital.keys()):
-                rating_key = next(
-                    (k for k in hospital.keys() if "rating" in k.lower()), None
-                )
-                if rating_key:
-                    details.append(f"Rating: {hospital[rating_key]:.1f}/10")
+            if has_cost:
+                cost = hospital["average_covered_charges"]
+                details.append(f"Cost: ${_format_money(cost)}")
+            if rating_key:
+                details.append(f"Rating: {hospital[rating_key]:.1f}/10")
 
             detail_str = f" ({', '.join(details)})" if details else ""
-            response += f"{i}. {name}{location}{detail_str}\n"
+            lines.append(f"{i}. {name}{location}{detail_str}")
 
+        response = "\n".join(lines) + "\n"
         if len(results) > 5:
             response += f"\n... and {len(results) - 5} more hospitals"
 
         return response
 
 
+def detect_cheapest_drg_intent(question: str) -> Optional[str]:
+    """
+    Return the DRG code for high-confidence "cheapest for DRG nnn" questions
+    """
+    question_lower = question.lower()
+    if "cheapest" not in question_lower and "lowest cost" not in question_lower:
+        return None
+    drg_match = _DRG_CODE_RE.search(question)
+    return drg_match.group(1) if drg_match else None
+
+
+def confirms_cheapest_drg(query_analysis: Dict[str, Any], drg_code: str) -> bool:
+    """
+    Check that the model's own SQL has the canonical query's structure: plain
+    provider columns including name and cost, filtered only by a prefix match
+    on this DRG, cheapest first, ten rows. Any other filter, join, ordering or
+    limit means the model wants something else
+    """
+    if query_analysis["type"] != "sql_query":
+        return False
+    shape = _CHEAPEST_BY_DRG_SHAPE_RE.fullmatch(normalize_sql(query_analysis["sql"]))
+    if not shape:
+        return False
+    columns = set(shape.group("columns").split(", "))
+    if not {"provider_name", "average_covered_charges"} <= columns:
+        return False
+    params = query_analysis.get("params", {})
+    params = {name.lower(): value for name, value in params.items()}
+    return params == {shape.group("param"): f"{drg_code}%"}
+
+
+async def run_speculative_query(db: AsyncSession, drg_code: str) -> Optional[list]:
+    """
+    Run the canonical cheapest-by-DRG query, returning None if it fails
+    """
+    try:
+        # Not shielded: on cancellation execute_custom_query's rollback runs
+        # before the request-scoped session is closed
+        return await execute_custom_query(
+            db, CHEAPEST_BY_DRG_SQL, {"drg_prefix": f"{drg_code}%"}
+        )
+    except Exception as e:
+        logger.warning(f"Speculative DRG {drg_code} query failed: {str(e)}")
+        return None
+
+
 async def process_natural_language_query(
     question: str, db: AsyncSession
 ) -> Dict[str, str]:
     """
     Main function to process natural language queries about healthcare costs
     """
-    # Step 1: Classify and process the query with OpenAI
-    query_analysis = await classify_and_process_query(question)
+    # Step 1: Classify and process the query with OpenAI, reusing prior answers
+    question_key = question_cache_key(question)
+    query_analysis = classification_cache.get(question_key)
+    speculative_results = None
+    if query_analysis is None:
+        drg_code = detect_cheapest_drg_intent(question)
+        if drg_code:
+            # Overlap the canonical query with the OpenAI call; keep its rows
+            # only if the model turns out to want the same query
+            query_analysis, speculative_results = await asyncio.gather(
+                classify_and_process_query(question),
+                run_speculative_query(db, drg_code),
+            )
+            if not confirms_cheapest_drg(query_analysis, drg_code):
+                speculative_results = None
+        else:
+            query_analysis = await classify_and_process_query(question)
+        if query_analysis["type"] != "error":
+            classification_cache.set(question_key, query_analysis)
 
     if query_analysis["type"] == "out_of_scope":
         return {"answer": query_analysis["response"], "data_source": "ai_response"}
@@ -206,9 +393,14 @@ async def process_natural_language_query(
         try:
             # Step 2: Execute the generated SQL query
             sql_query = query_analysis["sql"]
-            logger.info(f"Executing SQL query: {sql_query}")
-
-            results = await execute_custom_query(db, sql_query)
+            params = query_analysis.get("params", {})
+            logger.info(f"Executing SQL query: {sql_query} with params {params}")
+
+            sql_key = sql_cache_key(sql_query, params)
+            results = speculative_results or query_result_cache.get(sql_key)
+            if results is None:
+                results = await execute_custom_query(db, sql_query, params)
+                query_result_cache.set(sql_key, results)
 
             # Step 3: Format results into natural language
             formatted_response = format_query_results(results, question)
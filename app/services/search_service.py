@@ -1,29 +1,79 @@
 # app/services/search_service.py
+import asyncio
+import time
+from collections import OrderedDict
 from sqlalchemy.ext.asyncio import AsyncSession
 from geopy.geocoders import Nominatim
 from geopy.exc import GeocoderTimedOut, GeocoderServiceError
-from typing import Optional, Tuple
+from typing import Dict, Optional, Tuple
 import logging
-from ..crud import get_providers_by_drg_and_location, get_provider_count
-from ..schemas import ProvidersSearchResponse, ProviderResponse
+from crud import get_providers_by_drg_and_location
+from schemas import ProvidersSearchResponse, ProviderResponse
 
 logger = logging.getLogger(__name__)
 
+# Roughly the number of US ZIP5 codes, so the whole working set fits
+ZIP_CACHE_SIZE = 50_000
+# Nominatim's usage policy allows at most one request per second
+NOMINATIM_MIN_DELAY_SECONDS = 1.0
+
 
 class GeocodingService:
     def __init__(self):
         self.geocoder = Nominatim(user_agent="healthcare_cost_navigator")
+        # ZIP -> coordinates (or None for "not found"), least recently used first
+        self._zip_cache: OrderedDict = OrderedDict()
+        # Lookups already on their way to Nominatim, shared by every request
+        # asking for the same ZIP meanwhile
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self._nominatim_lock = asyncio.Lock()
+        self._last_request_at = float("-inf")
+
+    def _geocode_zip(self, zip_code: str) -> Optional[Tuple[float, float]]:
+        # Add country code for more accurate results
+        location = self.geocoder.geocode(f"{zip_code}, USA", timeout=10)
+        if location:
+            return (location.latitude, location.longitude)
+        return None
+
+    async def _fetch_zip(self, zip_code: str) -> Optional[Tuple[float, float]]:
+        # One Nominatim request at a time, spaced by the policy delay; the
+        # blocking client runs off the event loop
+        async with self._nominatim_lock:
+            wait = self._last_request_at + NOMINATIM_MIN_DELAY_SECONDS
+            wait -= time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            try:
+                coords = await asyncio.to_thread(self._geocode_zip, zip_code)
+            finally:
+                self._last_request_at = time.monotonic()
+
+        # Geocoder errors propagate above, so only real answers (including
+        # "not found") are cached and failures get retried
+        self._zip_cache[zip_code] = coords
+        if len(self._zip_cache) > ZIP_CACHE_SIZE:
+            self._zip_cache.popitem(last=False)
+        return coords
 
     async def get_coordinates_from_zip(
         self, zip_code: str
     ) -> Optional[Tuple[float, float]]:
         """Convert ZIP code to latitude/longitude coordinates"""
+        zip_code = zip_code.strip()[:5]
+        # Cache hits are answered on the event loop, with no thread hop
+        if zip_code in self._zip_cache:
+            self._zip_cache.move_to_end(zip_code)
+            return self._zip_cache[zip_code]
+
+        lookup = self._in_flight.get(zip_code)
+        if lookup is None:
+            lookup = asyncio.ensure_future(self._fetch_zip(zip_code))
+            self._in_flight[zip_code] = lookup
+            lookup.add_done_callback(lambda _: self._in_flight.pop(zip_code, None))
         try:
-            # Add country code for more accurate results
-            location = self.geocoder.geocode(f"{zip_code}, USA", timeout=10)
-            if location:
-                return (location.latitude, location.longitude)
-            return None
+            # Shielded so one cancelled request doesn't cancel the shared lookup
+            return await asyncio.shield(lookup)
         except (GeocoderTimedOut, GeocoderServiceError) as e:
             logger.error(f"Geocoding failed for ZIP {zip_code}: {str(e)}")
             return None
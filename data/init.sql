@@ -1,3 +1,5 @@
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
 CREATE TABLE IF NOT EXISTS provider_data (
     id SERIAL PRIMARY KEY,
     Rndrng_Prvdr_CCN TEXT,
@@ -5,14 +7,19 @@ CREATE TABLE IF NOT EXISTS provider_data (
     Rndrng_Prvdr_City TEXT,
     Rndrng_Prvdr_St TEXT,
     Rndrng_Prvdr_State_FIPS TEXT,
-    Rndrng_Prvdr_Zip5 TEXT,
+    Rndrng_Prvdr_Zip5 CHAR(5),
     Rndrng_Prvdr_State_Abrvtn TEXT,
     Rndrng_Prvdr_RUCA TEXT,
     Rndrng_Prvdr_RUCA_Desc TEXT,
-    DRG_Cd TEXT,
+    DRG_Cd CHAR(3),
     DRG_Desc TEXT,
-    Tot_Dschrgs INT,
-    Avg_Submtd_Cvrd_Chrg FLOAT,
-    Avg_Tot_Pymt_Amt FLOAT,
-    Avg_Mdcr_Pymt_Amt FLOAT
+    Tot_Dschrgs SMALLINT,
+    Avg_Submtd_Cvrd_Chrg NUMERIC(12, 2),
+    Avg_Tot_Pymt_Amt NUMERIC(12, 2),
+    Avg_Mdcr_Pymt_Amt NUMERIC(12, 2)
 );
+
+CREATE INDEX IF NOT EXISTS ix_provider_data_rndrng_prvdr_ccn ON provider_data (Rndrng_Prvdr_CCN);
+CREATE INDEX IF NOT EXISTS ix_provider_data_drg_desc_trgm ON provider_data USING gin (DRG_Desc gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS ix_provider_data_zip5 ON provider_data (Rndrng_Prvdr_Zip5);
+CREATE INDEX IF NOT EXISTS ix_provider_data_drg_state ON provider_data (DRG_Cd, Rndrng_Prvdr_State_Abrvtn);
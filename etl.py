@@ -1,18 +1,22 @@
 # etl.py
 import asyncio
+import numpy as np
 import pandas as pd
-import random
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy import text
+from geopy.adapters import AioHTTPAdapter
 from geopy.geocoders import Nominatim
 from geopy.exc import GeocoderTimedOut
+from geopy.extra.rate_limiter import AsyncRateLimiter
 import os
+import shelve
 import sys
 from dotenv import load_dotenv
 import logging
+from contextlib import aclosing
 from decimal import Decimal
-import time
+from typing import Optional
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -23,26 +27,185 @@ load_dotenv()
 # Add app directory to path to import models
 sys.path.append(os.path.join(os.path.dirname(__file__), "app"))
 
-from app.models import Provider, Rating, Base
+from database import Base
+from models import Provider, Rating
+
+# Persistent ZIP -> (lat, lon) cache so re-runs skip Nominatim entirely
+GEOCODE_CACHE_PATH = os.getenv("GEOCODE_CACHE_PATH", "geocode_cache")
+# Nominatim's usage policy allows at most one request per second
+NOMINATIM_MIN_DELAY_SECONDS = 1.0
+# Workers pulling uncached ZIPs; the rate limiter spaces their requests, so
+# two are enough to overlap one slow response with the next request
+GEOCODE_WORKERS = 2
+# Rows per CSV chunk; peak memory scales with this instead of the file size
+CHUNK_ROWS = 100_000
+# Cleaned chunks allowed to wait for the loader; bounds memory while parsing
+# of the next chunk overlaps with geocoding and loading the current one
+PIPELINE_DEPTH = 2
+# Chunk loads allowed in flight; the engine's pool is sized to match so
+# concurrent loads never queue for, or overshoot, Postgres connections
+DB_CONCURRENCY = 8
+# CMS CSV header -> ETL column name (adjust these based on your CSV structure)
+_COLUMN_MAPPING = {
+    "DRG Definition": "ms_drg_definition",
+    "Provider Id": "provider_id",
+    "Provider Name": "provider_name",
+    "Provider Street Address": "provider_address",
+    "Provider City": "provider_city",
+    "Provider State": "provider_state",
+    "Provider Zip Code": "provider_zip_code",
+    "Hospital Referral Region (HRR) Description": "hrr_description",
+    "Total Discharges": "total_discharges",
+    "Average Covered Charges": "average_covered_charges",
+    "Average Total Payments": "average_total_payments",
+    "Average Medicare Payments": "average_medicare_payments",
+}
+# Read every mapped column as Arrow-backed text up front so pandas skips type
+# inference and no per-value Python str objects are built; CMS amounts are
+# "$"-formatted, so clean_data does the numeric conversion
+_DTYPES = dict.fromkeys(_COLUMN_MAPPING, "string[pyarrow]")
+# Columns clean_data strips of currency formatting and converts to numbers
+_NUMERIC_COLS = (
+    "total_discharges",
+    "average_covered_charges",
+    "average_total_payments",
+    "average_medicare_payments",
+)
+# providers table columns in INSERT order, and the widths text is cut to
+_PROVIDER_COLUMNS = [
+    "provider_id",
+    "provider_name",
+    "provider_city",
+    "provider_state",
+    "provider_zip_code",
+    "latitude",
+    "longitude",
+    "ms_drg_definition",
+    "total_discharges",
+    "average_covered_charges",
+    "average_total_payments",
+    "average_medicare_payments",
+]
+_TEXT_WIDTHS = {
+    "provider_name": 255,
+    "provider_city": 100,
+    "provider_state": 2,
+    "provider_zip_code": 10,
+}
+# Natural key of a providers row (uq_providers_provider_drg)
+_PROVIDER_KEY = ["provider_id", "ms_drg_definition"]
+_FLOAT_COLUMNS = [
+    "latitude",
+    "longitude",
+    "average_covered_charges",
+    "average_total_payments",
+    "average_medicare_payments",
+]
+# Rows per executemany; Postgres batch throughput plateaus around 10k rows
+BATCH = 10_000
+# Providers already loaded for the same (provider_id, DRG) are skipped, so a
+# re-run of a partially loaded batch doesn't duplicate them
+INSERT_PROVIDERS_SQL = text(
+    """
+    INSERT INTO providers (
+        provider_id, provider_name, provider_city, provider_state,
+        provider_zip_code, latitude, longitude, ms_drg_definition,
+        total_discharges, average_covered_charges, average_total_payments,
+        average_medicare_payments
+    ) VALUES (
+        :provider_id, :provider_name, :provider_city, :provider_state,
+        :provider_zip_code, :latitude, :longitude, :ms_drg_definition,
+        :total_discharges, :average_covered_charges, :average_total_payments,
+        :average_medicare_payments
+    )
+    ON CONFLICT (provider_id, ms_drg_definition) DO NOTHING
+"""
+)
+INSERT_RATINGS_SQL = text(
+    """
+    INSERT INTO ratings (provider_id, rating)
+    VALUES (:provider_id, :rating)
+"""
+)
+# Mock rating scale and its weights, normalized into probabilities
+_RATING_VALUES = np.arange(1, 11)
+_RATING_WEIGHTS = np.array([1, 1, 2, 3, 5, 8, 12, 15, 10, 8], dtype=np.float64)
+_RATING_WEIGHTS /= _RATING_WEIGHTS.sum()
+
+
+def _deferrable_indexes(table) -> list:
+    # Unique indexes stay, as does uq_providers_provider_drg (a constraint, so
+    # never in table.indexes): the provider load's ON CONFLICT needs them
+    return [index for index in table.indexes if not index.unique]
 
 
 class HealthcareETL:
-    def __init__(self, database_url: str, csv_file_path: str):
+    def __init__(self, database_url: str, csv_file_path: str, fast_load: bool = False):
         self.database_url = database_url
         self.csv_file_path = csv_file_path
-        self.engine = create_async_engine(database_url, echo=False)
+        # Skip WAL and index upkeep during the load (fresh tables only)
+        self.fast_load = fast_load
+        # asyncpg can bulk load through the COPY protocol; other drivers INSERT
+        self.use_copy = database_url.startswith("postgresql+asyncpg")
+        engine_options = {}
+        if self.use_copy:
+            # The ETL talks to Postgres directly (not via PgBouncer), so cache
+            # prepared statements per connection, and turn JIT off since bulk
+            # statements would pay its warmup on every batch
+            engine_options["connect_args"] = {
+                "prepared_statement_cache_size": 128,
+                "statement_cache_size": 128,
+                "server_settings": {"jit": "off"},
+            }
+        # The semaphore keeps loads within pool_size; the overflow is headroom
+        # for the schema, fast-load and summary connections
+        self.engine = create_async_engine(
+            database_url,
+            echo=False,
+            pool_size=DB_CONCURRENCY,
+            max_overflow=4,
+            pool_pre_ping=False,
+            **engine_options,
+        )
+        self._db_sem = asyncio.Semaphore(DB_CONCURRENCY)
         self.AsyncSessionLocal = sessionmaker(
             self.engine, class_=AsyncSession, expire_on_commit=False
         )
-        self.geocoder = Nominatim(user_agent="healthcare_etl", timeout=10)
 
     async def create_tables(self):
         """Create database tables"""
+        # Only the ETL's own tables; provider_data belongs to the upload API
+        tables = self._load_tables()
         async with self.engine.begin() as conn:
-            await conn.run_sync(Base.metadata.drop_all)
-            await conn.run_sync(Base.metadata.create_all)
+            await conn.run_sync(Base.metadata.drop_all, tables=tables)
+            await conn.run_sync(Base.metadata.create_all, tables=tables)
         logger.info("Database tables created successfully")
 
+    def _load_tables(self) -> list:
+        # Referenced (parent) table first
+        return [Provider.__table__, Rating.__table__]
+
+    async def begin_fast_load(self):
+        """Make the freshly created tables UNLOGGED and drop their indexes"""
+        async with self.engine.begin() as conn:
+            # A logged table can't reference an unlogged one, so children first
+            for table in reversed(self._load_tables()):
+                await conn.execute(text(f"ALTER TABLE {table.name} SET UNLOGGED"))
+                for index in _deferrable_indexes(table):
+                    await conn.execute(text(f"DROP INDEX IF EXISTS {index.name}"))
+        logger.info("Tables switched to UNLOGGED with indexes deferred")
+
+    async def end_fast_load(self):
+        """Rebuild the deferred indexes and make the tables durable again"""
+        async with self.engine.begin() as conn:
+            for table in self._load_tables():
+                # Built once over the loaded rows; plain CREATE INDEX since
+                # nothing else writes to these tables during the ETL
+                for index in _deferrable_indexes(table):
+                    await conn.run_sync(index.create)
+                await conn.execute(text(f"ALTER TABLE {table.name} SET LOGGED"))
+        logger.info("Indexes rebuilt and tables switched back to LOGGED")
+
     def clean_data(self, df: pd.DataFrame) -> pd.DataFrame:
         """Clean and prepare the healthcare data"""
         logger.info(f"Starting data cleaning. Original shape: {df.shape}")
@@ -50,24 +213,10 @@ class HealthcareETL:
         # Display column names for debugging
         logger.info(f"Available columns: {df.columns.tolist()}")
 
-        # Create column mapping (adjust these based on your CSV structure)
-        column_mapping = {
-            "DRG Definition": "ms_drg_definition",
-            "Provider Id": "provider_id",
-            "Provider Name": "provider_name",
-            "Provider Street Address": "provider_address",
-            "Provider City": "provider_city",
-            "Provider State": "provider_state",
-            "Provider Zip Code": "provider_zip_code",
-            "Hospital Referral Region (HRR) Description": "hrr_description",
-            "Total Discharges": "total_discharges",
-            "Average Covered Charges": "average_covered_charges",
-            "Average Total Payments": "average_total_payments",
-            "Average Medicare Payments": "average_medicare_payments",
-        }
-
         # Rename columns if they exist
-        existing_columns = {k: v for k, v in column_mapping.items() if k in df.columns}
+        existing_columns = {
+            k: v for k, v in _COLUMN_MAPPING.items() if k in df.columns
+        }
         df = df.rename(columns=existing_columns)
 
         # Handle missing columns gracefully
@@ -81,33 +230,54 @@ class HealthcareETL:
         df = df.dropna(subset=required_columns)  # Drop rows with missing required data
 
         # Clean numeric columns
-        numeric_columns = [
-            "total_discharges",
-            "average_covered_charges",
-            "average_total_payments",
-            "average_medicare_payments",
-        ]
-        for col in numeric_columns:
-            if col in df.columns:
-                # Remove $ signs and commas, convert to numeric
+        for col in _NUMERIC_COLS:
+            # Only text columns can carry $ signs and commas; numeric ones are done
+            if col in df.columns and pd.api.types.is_string_dtype(df[col]):
+                # Literal (non-regex) replaces stay inside Arrow compute kernels
+                cleaned = (
+                    df[col]
+                    .astype("string[pyarrow]")
+                    .str.replace("$", "", regex=False)
+                    .str.replace(",", "", regex=False)
+                )
                 df[col] = pd.to_numeric(
-                    df[col].astype(str).str.replace(r"[\$,]", "", regex=True),
-                    errors="coerce",
+                    cleaned, errors="coerce", dtype_backend="pyarrow"
                 )
 
         # Clean provider_id (ensure it's string and not too long)
-        df["provider_id"] = df["provider_id"].astype(str).str[:10]
+        df["provider_id"] = (
+            df["provider_id"].astype("string[pyarrow]").str.slice(0, 10)
+        )
 
-        # Clean ZIP codes
+        # Normalize ZIP codes to 5 digits ("10001.0", "10001-1234", " 10001 "
+        # are all one ZIP) so each is geocoded and cached once. Leading zeros
+        # lost upstream are restored ("2114" -> "02114", Puerto Rico "907" ->
+        # "00907"); only values not starting with 3+ digits become <NA>
         if "provider_zip_code" in df.columns:
-            df["provider_zip_code"] = df["provider_zip_code"].astype(str).str[:10]
+            df["provider_zip_code"] = (
+                df["provider_zip_code"]
+                .astype("string[pyarrow]")
+                .str.extract(r"^\s*(\d{3,5})", expand=False)
+                .str.zfill(5)
+            )
 
-        # Remove duplicates based on provider_id and ms_drg_definition
-        df = df.drop_duplicates(subset=["provider_id", "ms_drg_definition"])
+        # Duplicates within the chunk; ones spanning chunks are skipped by the
+        # load's ON CONFLICT on the same key, so no run-wide key set is kept
+        df = df.drop_duplicates(subset=_PROVIDER_KEY)
 
         logger.info(f"Data cleaning completed. Final shape: {df.shape}")
         return df
 
+    async def _geocode_zip(self, geocode: AsyncRateLimiter, zip_code: str) -> tuple:
+        """Geocode one ZIP code, returning (None, None) if Nominatim has no match"""
+        location = await geocode(f"{zip_code}, USA")
+
+        if location:
+            logger.info(f"Geocoded {zip_code}: {location.latitude}, {location.longitude}")
+            return (location.latitude, location.longitude)
+        logger.warning(f"Could not geocode ZIP: {zip_code}")
+        return (None, None)
+
     async def geocode_providers(self, df: pd.DataFrame) -> pd.DataFrame:
         """Add latitude and longitude coordinates to providers"""
         logger.info("Starting geocoding process...")
@@ -119,42 +289,77 @@ class HealthcareETL:
             return df
 
         # Get unique ZIP codes to minimize API calls
-        unique_zips = df["provider_zip_code"].dropna().unique()
-        zip_coordinates = {}
-
-        for i, zip_code in enumerate(unique_zips):
-            if pd.isna(zip_code) or zip_code == "nan":
-                continue
-
-            try:
-                location = self.geocoder.geocode(f"{zip_code}, USA")
-                if location:
-                    zip_coordinates[zip_code] = (location.latitude, location.longitude)
-                    logger.info(
-                        f"Geocoded {zip_code}: {location.latitude}, {location.longitude}"
-                    )
-                else:
-                    zip_coordinates[zip_code] = (None, None)
-                    logger.warning(f"Could not geocode ZIP: {zip_code}")
-
-                # Rate limiting to avoid hitting API limits
-                time.sleep(0.1)
+        unique_zips = [
+            zip_code
+            for zip_code in df["provider_zip_code"].dropna().unique()
+            if zip_code != "nan"
+        ]
 
-            except (GeocoderTimedOut, Exception) as e:
-                logger.error(f"Geocoding failed for {zip_code}: {str(e)}")
-                zip_coordinates[zip_code] = (None, None)
+        with shelve.open(GEOCODE_CACHE_PATH) as cache:
+            async with Nominatim(
+                user_agent="healthcare_etl",
+                timeout=10,
+                adapter_factory=AioHTTPAdapter,
+            ) as geocoder:
+                # Spaces request starts by the policy delay on a running clock,
+                # so slow responses don't add a sleep on top. Errors still
+                # raise after the retries so they are never cached as a miss
+                geocode = AsyncRateLimiter(
+                    geocoder.geocode,
+                    min_delay_seconds=NOMINATIM_MIN_DELAY_SECONDS,
+                    max_retries=2,
+                    error_wait_seconds=5,
+                    swallow_exceptions=False,
+                )
 
-            # Progress update
-            if (i + 1) % 50 == 0:
-                logger.info(f"Geocoded {i + 1}/{len(unique_zips)} ZIP codes")
+                # Cache hits are answered here; only misses go to the workers,
+                # so a chunk costs GEOCODE_WORKERS tasks rather than one per ZIP
+                zip_coordinates = {}
+                misses = asyncio.Queue()
+                for zip_code in unique_zips:
+                    if zip_code in cache:
+                        zip_coordinates[zip_code] = cache[zip_code]
+                    else:
+                        misses.put_nowait(zip_code)
+                completed = len(zip_coordinates)
+
+                async def geocode_worker():
+                    nonlocal completed
+                    while not misses.empty():
+                        zip_code = misses.get_nowait()
+                        try:
+                            coordinates = await self._geocode_zip(geocode, zip_code)
+                            cache[zip_code] = coordinates
+                        except (GeocoderTimedOut, Exception) as e:
+                            # Left out of the cache so the next run retries it
+                            logger.error(f"Geocoding failed for {zip_code}: {str(e)}")
+                            coordinates = (None, None)
+                        zip_coordinates[zip_code] = coordinates
+
+                        # Progress update
+                        completed += 1
+                        if completed % 50 == 0:
+                            logger.info(
+                                f"Geocoded {completed}/{len(unique_zips)} ZIP codes"
+                            )
+
+                await asyncio.gather(
+                    *(geocode_worker() for _ in range(GEOCODE_WORKERS))
+                )
 
-        # Map coordinates back to dataframe
-        df["latitude"] = df["provider_zip_code"].map(
-            lambda x: zip_coordinates.get(x, (None, None))[0]
-        )
-        df["longitude"] = df["provider_zip_code"].map(
-            lambda x: zip_coordinates.get(x, (None, None))[1]
+        # Hash-join coordinates back onto the rows instead of a per-row lookup;
+        # the key dtype matches df's so the join doesn't upcast either side
+        coords = pd.DataFrame(
+            [(z, lat, lon) for z, (lat, lon) in zip_coordinates.items()],
+            columns=["provider_zip_code", "latitude", "longitude"],
+        ).astype(
+            {
+                "provider_zip_code": df["provider_zip_code"].dtype,
+                "latitude": "float64",
+                "longitude": "float64",
+            }
         )
+        df = df.merge(coords, on="provider_zip_code", how="left")
 
         geocoded_count = df["latitude"].notna().sum()
         logger.info(f"Successfully geocoded {geocoded_count}/{len(df)} providers")
@@ -165,106 +370,119 @@ class HealthcareETL:
         """Generate mock star ratings for providers"""
         logger.info(f"Generating mock ratings for {len(provider_ids)} providers")
 
-        ratings = []
-        for provider_id in provider_ids:
-            # Generate 1-3 ratings per provider with realistic distribution
-            num_ratings = random.randint(1, 3)
-            for _ in range(num_ratings):
-                # Weighted towards higher ratings (realistic hospital distribution)
-                rating = random.choices(
-                    population=[1, 2, 3, 4, 5, 6, 7, 8, 9, 10],
-                    weights=[1, 1, 2, 3, 5, 8, 12, 15, 10, 8],
-                    k=1,
-                )[0]
+        rng = np.random.default_rng()
+        # 1-3 ratings per provider, drawn in one shot for all providers
+        counts = rng.integers(1, 3, size=len(provider_ids), endpoint=True)
+        # Weighted towards higher ratings (realistic hospital distribution)
+        values = rng.choice(_RATING_VALUES, size=int(counts.sum()), p=_RATING_WEIGHTS)
+        provider_id_per_rating = np.repeat(
+            np.asarray(provider_ids, dtype=object), counts
+        )
 
-                ratings.append({"provider_id": provider_id, "rating": float(rating)})
+        # (provider_id, rating) tuples, the row shape COPY binds positionally
+        ratings = list(
+            zip(provider_id_per_rating.tolist(), values.astype(np.float64).tolist())
+        )
 
         logger.info(f"Generated {len(ratings)} total ratings")
         return ratings
 
+    def prepare_provider_records(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Coerce provider columns to their load types, with None for NULL"""
+        # Missing optional columns come back as all-NULL
+        df = df.reindex(columns=_PROVIDER_COLUMNS)
+
+        # Truncate text and cast numerics once per column; nullable dtypes
+        # keep missing values as <NA> so they map to SQL NULL below
+        df = df.assign(
+            **{
+                col: df[col].astype("string").str.slice(0, width)
+                for col, width in _TEXT_WIDTHS.items()
+            }
+        )
+        df[["provider_id", "ms_drg_definition"]] = df[
+            ["provider_id", "ms_drg_definition"]
+        ].astype("string")
+        df[_FLOAT_COLUMNS] = df[_FLOAT_COLUMNS].astype("Float64")
+        # Truncate fractional discharges like the row-wise int() cast did
+        df["total_discharges"] = np.trunc(
+            df["total_discharges"].astype("Float64")
+        ).astype("Int64")
+
+        return df.astype(object).where(df.notna(), None)
+
+    async def copy_records(
+        self,
+        table: str,
+        columns: list,
+        records: list,
+        conflict_columns: Optional[list] = None,
+    ):
+        """
+        Bulk load rows with asyncpg's binary COPY, bypassing the SQL parser.
+        With conflict_columns, rows are copied into a temporary staging table
+        and moved over with ON CONFLICT (conflict_columns) DO NOTHING, which
+        COPY itself can't do
+        """
+        try:
+            async with self.engine.begin() as conn:
+                raw_connection = await conn.get_raw_connection()
+                driver_connection = raw_connection.driver_connection
+                if not conflict_columns:
+                    await driver_connection.copy_records_to_table(
+                        table, records=records, columns=columns
+                    )
+                    return
+
+                # Temp tables are per connection, so concurrent loads never
+                # share one; it is dropped when this transaction commits
+                staging = f"{table}_staging"
+                column_list = ", ".join(columns)
+                await driver_connection.execute(
+                    f"CREATE TEMP TABLE {staging} ON COMMIT DROP AS "
+                    f"SELECT {column_list} FROM {table} WITH NO DATA"
+                )
+                await driver_connection.copy_records_to_table(
+                    staging, records=records, columns=columns
+                )
+                await driver_connection.execute(
+                    f"INSERT INTO {table} ({column_list}) "
+                    f"SELECT {column_list} FROM {staging} "
+                    f"ON CONFLICT ({', '.join(conflict_columns)}) DO NOTHING"
+                )
+        except Exception as e:
+            logger.error(f"Error copying records into {table}: {str(e)}")
+            raise
+
     async def load_providers(self, df: pd.DataFrame):
         """Load provider data into database"""
         logger.info("Loading provider data into database...")
+        providers = self.prepare_provider_records(df)
+
+        if self.use_copy:
+            # Materialize each column once and zip them into row tuples,
+            # rather than looking every cell up by name
+            records = list(
+                zip(*(providers[col].tolist() for col in _PROVIDER_COLUMNS))
+            )
+            await self.copy_records(
+                "providers",
+                _PROVIDER_COLUMNS,
+                records,
+                conflict_columns=_PROVIDER_KEY,
+            )
+            logger.info(f"Successfully loaded {len(records)} provider records")
+            return
+
+        providers_data = providers.to_dict(orient="records")
 
         async with self.AsyncSessionLocal() as session:
             try:
-                providers_data = []
-                for _, row in df.iterrows():
-                    provider_data = {
-                        "provider_id": str(row["provider_id"]),
-                        "provider_name": str(row["provider_name"])[:255],
-                        "provider_city": (
-                            str(row.get("provider_city", ""))[:100]
-                            if pd.notna(row.get("provider_city"))
-                            else None
-                        ),
-                        "provider_state": (
-                            str(row.get("provider_state", ""))[:2]
-                            if pd.notna(row.get("provider_state"))
-                            else None
-                        ),
-                        "provider_zip_code": (
-                            str(row.get("provider_zip_code", ""))[:10]
-                            if pd.notna(row.get("provider_zip_code"))
-                            else None
-                        ),
-                        "latitude": (
-                            float(row["latitude"])
-                            if pd.notna(row.get("latitude"))
-                            else None
-                        ),
-                        "longitude": (
-                            float(row["longitude"])
-                            if pd.notna(row.get("longitude"))
-                            else None
-                        ),
-                        "ms_drg_definition": (
-                            str(row["ms_drg_definition"])
-                            if pd.notna(row.get("ms_drg_definition"))
-                            else None
-                        ),
-                        "total_discharges": (
-                            int(row["total_discharges"])
-                            if pd.notna(row.get("total_discharges"))
-                            else None
-                        ),
-                        "average_covered_charges": (
-                            float(row["average_covered_charges"])
-                            if pd.notna(row.get("average_covered_charges"))
-                            else None
-                        ),
-                        "average_total_payments": (
-                            float(row["average_total_payments"])
-                            if pd.notna(row.get("average_total_payments"))
-                            else None
-                        ),
-                        "average_medicare_payments": (
-                            float(row["average_medicare_payments"])
-                            if pd.notna(row.get("average_medicare_payments"))
-                            else None
-                        ),
-                    }
-                    providers_data.append(provider_data)
-
-                # Bulk insert providers
-                await session.execute(
-                    text(
-                        """
-                        INSERT INTO providers (
-                            provider_id, provider_name, provider_city, provider_state, 
-                            provider_zip_code, latitude, longitude, ms_drg_definition,
-                            total_discharges, average_covered_charges, average_total_payments, 
-                            average_medicare_payments
-                        ) VALUES (
-                            :provider_id, :provider_name, :provider_city, :provider_state,
-                            :provider_zip_code, :latitude, :longitude, :ms_drg_definition,
-                            :total_discharges, :average_covered_charges, :average_total_payments,
-                            :average_medicare_payments
-                        )
-                    """
-                    ),
-                    providers_data,
-                )
+                # Bulk insert providers in fixed-size batches, one transaction
+                for i in range(0, len(providers_data), BATCH):
+                    await session.execute(
+                        INSERT_PROVIDERS_SQL, providers_data[i : i + BATCH]
+                    )
 
                 await session.commit()
                 logger.info(
@@ -280,17 +498,25 @@ class HealthcareETL:
         """Load ratings data into database"""
         logger.info("Loading ratings data into database...")
 
+        if self.use_copy:
+            await self.copy_records(
+                "ratings", ["provider_id", "rating"], ratings_data
+            )
+            logger.info(f"Successfully loaded {len(ratings_data)} rating records")
+            return
+
+        # Other drivers bind by name, so only this path pays for dicts
+        ratings_data = [
+            {"provider_id": provider_id, "rating": rating}
+            for provider_id, rating in ratings_data
+        ]
+
         async with self.AsyncSessionLocal() as session:
             try:
-                await session.execute(
-                    text(
-                        """
-                        INSERT INTO ratings (provider_id, rating)
-                        VALUES (:provider_id, :rating)
-                    """
-                    ),
-                    ratings_data,
-                )
+                for i in range(0, len(ratings_data), BATCH):
+                    await session.execute(
+                        INSERT_RATINGS_SQL, ratings_data[i : i + BATCH]
+                    )
 
                 await session.commit()
                 logger.info(f"Successfully loaded {len(ratings_data)} rating records")
@@ -300,6 +526,85 @@ class HealthcareETL:
                 logger.error(f"Error loading ratings: {str(e)}")
                 raise
 
+    async def _iter_chunks(self):
+        """Yield raw CSV chunks, parsing each one on a worker thread"""
+        with pd.read_csv(
+            self.csv_file_path,
+            chunksize=CHUNK_ROWS,
+            # Unmapped CMS columns are never tokenized; a callable rather than
+            # a list so files missing optional columns still load
+            usecols=lambda column: column in _COLUMN_MAPPING,
+            dtype=_DTYPES,
+            dtype_backend="pyarrow",
+        ) as reader:
+            while True:
+                chunk = await asyncio.to_thread(next, reader, None)
+                if chunk is None:
+                    return
+                yield chunk
+
+    async def _load_chunk(self, df: pd.DataFrame):
+        """Load one chunk of providers once a database slot is free"""
+        async with self._db_sem:
+            await self.load_providers(df)
+
+    async def _produce_chunks(self, queue: asyncio.Queue):
+        """Parse and clean chunks on worker threads, then hand them to the loader"""
+        try:
+            # aclosing shuts the CSV reader as soon as the stream stops, not
+            # whenever the abandoned generator is collected
+            async with aclosing(self._iter_chunks()) as chunks:
+                async for chunk in chunks:
+                    await queue.put(await asyncio.to_thread(self.clean_data, chunk))
+        except asyncio.CancelledError:
+            # The consumer cancelled us and no longer reads the queue, so a
+            # put could wait forever on a full queue
+            raise
+        except BaseException:
+            # Stop the consumer; load_all re-raises the error from this task
+            await queue.put(None)
+            raise
+        else:
+            # End-of-input marker
+            await queue.put(None)
+
+    async def load_all(self):
+        """Stream, clean, geocode and load every provider row, then the ratings"""
+        # Stream the CSV chunk by chunk; a producer task parses and cleans the
+        # next chunks while this one is geocoded (the ZIP cache spans chunks),
+        # and earlier chunks load concurrently
+        logger.info(f"Loading CSV file: {self.csv_file_path}")
+        provider_ids = set()
+        queue = asyncio.Queue(maxsize=PIPELINE_DEPTH)
+        producer = asyncio.create_task(self._produce_chunks(queue))
+        loads = set()
+        try:
+            while (chunk := await queue.get()) is not None:
+                chunk = await self.geocode_providers(chunk)
+                provider_ids.update(chunk["provider_id"].unique())
+
+                # Cap chunks held in memory awaiting a load slot
+                if len(loads) >= DB_CONCURRENCY:
+                    done, loads = await asyncio.wait(
+                        loads, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for load in done:
+                        load.result()
+                loads.add(asyncio.create_task(self._load_chunk(chunk)))
+            await asyncio.gather(*loads)
+        except BaseException:
+            producer.cancel()
+            for load in loads:
+                load.cancel()
+            raise
+        # Re-raises a parse/clean error that ended the stream early
+        await producer
+
+        # Generate and load mock ratings
+        ratings_data = self.generate_mock_ratings(sorted(provider_ids))
+        async with self._db_sem:
+            await self.load_ratings(ratings_data)
+
     async def run_etl(self):
         """Run the complete ETL process"""
         logger.info("Starting Healthcare Cost Navigator ETL process...")
@@ -307,22 +612,25 @@ class HealthcareETL:
         try:
             # Step 1: Create database tables
             await self.create_tables()
+            fast_load = self.fast_load and self.engine.dialect.name == "postgresql"
+            if fast_load:
+                await self.begin_fast_load()
 
-            # Step 2: Load and clean CSV data
-            logger.info(f"Loading CSV file: {self.csv_file_path}")
-            df = pd.read_csv(self.csv_file_path)
-            df = self.clean_data(df)
-
-            # Step 3: Geocode provider locations
-            df = await self.geocode_providers(df)
-
-            # Step 4: Load provider data
-            await self.load_providers(df)
-
-            # Step 5: Generate and load mock ratings
-            unique_provider_ids = df["provider_id"].unique().tolist()
-            ratings_data = self.generate_mock_ratings(unique_provider_ids)
-            await self.load_ratings(ratings_data)
+            # Steps 2-5: Load providers and ratings
+            try:
+                await self.load_all()
+            finally:
+                # Restore even after a failed load, so the tables are never
+                # left unlogged (lost on a crash) and unindexed
+                if fast_load:
+                    try:
+                        await self.end_fast_load()
+                    except Exception:
+                        logger.critical(
+                            "Could not restore tables after fast load; they are "
+                            "UNLOGGED and unindexed until end_fast_load() is run"
+                        )
+                        raise
 
             logger.info("ETL process completed successfully!")
 
@@ -405,7 +713,9 @@ async def main():
         )
         return
 
-    etl = HealthcareETL(database_url, csv_file_path)
+    etl = HealthcareETL(
+        database_url, csv_file_path, fast_load=os.getenv("ETL_FAST_LOAD") == "1"
+    )
     await etl.run_etl()
 
 
@@ -0,0 +1,10 @@
+import os
+import sys
+
+# The app runs from inside app/ (see Dockerfile), so its modules import each
+# other by bare name; mirror that layout, plus the repo root for etl.py
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "app"))
+sys.path.insert(0, ROOT)
+
+os.environ.setdefault("OPENAI_API_KEY", "test")
@@ -0,0 +1,137 @@
+import asyncio
+
+from sqlalchemy.dialects import postgresql
+
+import crud
+
+
+class RecordingSession:
+    """Stands in for AsyncSession, keeping the statements it is given"""
+
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, statement, params=None):
+        self.statements.append(statement)
+        return []
+
+
+def compile_sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+
+def test_provider_search_filters_by_radius_when_located():
+    db = RecordingSession()
+
+    asyncio.run(
+        crud.get_providers_by_drg_and_location(
+            db, drg="470", latitude=40.7, longitude=-74.0, radius_km=25.0, limit=5
+        )
+    )
+
+    sql = compile_sql(db.statements[0])
+    assert "ms_drg_definition ILIKE" in sql
+    assert "acos" in sql
+    assert "LEFT OUTER JOIN" in sql
+    assert "LIMIT" in sql
+
+
+def test_provider_search_orders_by_cost_without_location():
+    db = RecordingSession()
+
+    asyncio.run(crud.get_providers_by_drg_and_location(db, drg="470"))
+
+    sql = compile_sql(db.statements[0])
+    assert "acos" not in sql
+    assert "ORDER BY providers.average_covered_charges" in sql
+
+
+def test_generated_query_is_always_capped():
+    sql, params = crud.cap_generated_query(
+        "SELECT provider_name FROM providers LIMIT 100000", {}
+    )
+
+    assert sql == (
+        "SELECT * FROM (SELECT provider_name FROM providers LIMIT 100000) "
+        "AS generated_query LIMIT :generated_query_limit"
+    )
+    assert params == {"generated_query_limit": crud.MAX_QUERY_ROWS}
+
+
+def test_generated_query_keeps_caller_params():
+    params = {"keyword": "%knee%"}
+
+    _, capped_params = crud.cap_generated_query(
+        "SELECT 1 FROM providers WHERE ms_drg_definition ILIKE :keyword", params
+    )
+
+    assert capped_params == {
+        "keyword": "%knee%",
+        "generated_query_limit": crud.MAX_QUERY_ROWS,
+    }
+    assert params == {"keyword": "%knee%"}
+
+
+def test_colons_outside_params_are_not_binds():
+    sql, params = crud.cap_generated_query(
+        "SELECT provider_name, 'open :late' AS hours, rating::text FROM providers "
+        "WHERE provider_state = :state",
+        {"state": "NY"},
+    )
+
+    binds = set(text_binds(sql))
+    assert binds == {"state", "generated_query_limit"}
+    compiled = compile_sql(crud.text(sql).bindparams(**params))
+    assert "'open :late'" in compiled
+    assert "rating::text" in compiled
+
+
+def text_binds(sql: str):
+    return crud.text(sql).compile().binds
+
+
+class FakeConnection:
+    def __init__(self, log):
+        self.log = log
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.log.append("close")
+
+    async def execution_options(self, **options):
+        self.log.append(("options", options))
+        return self
+
+    def begin(self):
+        return self
+
+    async def execute(self, statement, params=None):
+        self.log.append(str(statement))
+        return FakeResult()
+
+
+class FakeResult:
+    def mappings(self):
+        return [{"provider_name": "Bellevue"}]
+
+
+class FakeEngine:
+    def __init__(self):
+        self.log = []
+
+    def connect(self):
+        return FakeConnection(self.log)
+
+
+def test_custom_query_runs_in_its_own_read_only_transaction():
+    engine = FakeEngine()
+    session = type("Session", (), {"bind": engine})()
+
+    rows = asyncio.run(crud.execute_custom_query(session, "SELECT 1", {}))
+
+    assert rows == [{"provider_name": "Bellevue"}]
+    assert engine.log[0] == ("options", {"postgresql_readonly": True})
+    assert engine.log[1].startswith("SET LOCAL statement_timeout")
+    assert "generated_query LIMIT :generated_query_limit" in engine.log[2]
@@ -0,0 +1,231 @@
+import asyncio
+import io
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex
+
+import etl
+
+HEADER = ",".join(etl._COLUMN_MAPPING)
+
+
+def read_chunk(*rows: str) -> pd.DataFrame:
+    """Parse CSV rows the way _iter_chunks does"""
+    return pd.read_csv(
+        io.StringIO("\n".join([HEADER, *rows])),
+        usecols=lambda column: column in etl._COLUMN_MAPPING,
+        dtype=etl._DTYPES,
+        dtype_backend="pyarrow",
+    )
+
+
+def csv_row(provider_id="330123", drg="470 - MAJOR JOINT", zip_code="10001"):
+    return (
+        f'"{drg}",{provider_id},Bellevue,1 First Ave,New York,NY,{zip_code},'
+        '"NY - Manhattan",12,"$45,230.50","$20,000.00","$18,000.00"'
+    )
+
+
+@pytest.fixture
+def healthcare_etl():
+    # Never connects: only the in-memory transforms are exercised
+    return etl.HealthcareETL("postgresql+asyncpg://u:p@localhost/db", "unused.csv")
+
+
+def test_clean_data_drops_duplicate_provider_drg_rows(healthcare_etl):
+    chunk = read_chunk(
+        csv_row(),
+        csv_row(),
+        csv_row(drg="871 - SEPTICEMIA"),
+        csv_row(provider_id="330124"),
+    )
+
+    cleaned = healthcare_etl.clean_data(chunk)
+
+    assert len(cleaned) == 3
+    assert not cleaned.duplicated(subset=etl._PROVIDER_KEY).any()
+
+
+def test_load_providers_copies_with_a_conflict_target(healthcare_etl, monkeypatch):
+    calls = []
+
+    async def fake_copy_records(table, columns, records, conflict_columns=None):
+        calls.append((table, conflict_columns, len(records)))
+
+    monkeypatch.setattr(healthcare_etl, "copy_records", fake_copy_records)
+    cleaned = healthcare_etl.clean_data(read_chunk(csv_row()))
+    cleaned["latitude"] = None
+    cleaned["longitude"] = None
+
+    asyncio.run(healthcare_etl.load_providers(cleaned))
+
+    assert calls == [("providers", ["provider_id", "ms_drg_definition"], 1)]
+
+
+def test_insert_statements_only_skip_provider_key_conflicts():
+    assert (
+        "ON CONFLICT (provider_id, ms_drg_definition) DO NOTHING"
+        in etl.INSERT_PROVIDERS_SQL.text
+    )
+    # A provider has several ratings, so there is no conflict to skip
+    assert "ON CONFLICT" not in etl.INSERT_RATINGS_SQL.text
+
+
+@pytest.mark.parametrize(
+    "raw, expected",
+    [
+        ("10001", "10001"),
+        ("10001.0", "10001"),
+        ("10001-1234", "10001"),
+        ('" 10001 "', "10001"),
+        ("2114", "02114"),
+        ("1001.0", "01001"),
+        ("907", "00907"),
+        ("N/A", None),
+    ],
+)
+def test_clean_data_normalizes_zip_codes(healthcare_etl, raw, expected):
+    cleaned = healthcare_etl.clean_data(read_chunk(csv_row(zip_code=raw)))
+
+    zip_code = cleaned["provider_zip_code"].iloc[0]
+    if expected is None:
+        assert pd.isna(zip_code)
+    else:
+        assert zip_code == expected
+
+
+def test_prepare_provider_records_truncates_discharges(healthcare_etl):
+    df = pd.DataFrame(
+        {
+            "provider_id": ["330123", "330124", "330125"],
+            "ms_drg_definition": ["470 - MAJOR JOINT"] * 3,
+            "total_discharges": [12.9, 3.5, None],
+        }
+    )
+
+    records = healthcare_etl.prepare_provider_records(df)
+
+    assert records["total_discharges"].tolist() == [12, 3, None]
+
+
+def tracked_chunks(healthcare_etl, monkeypatch, count):
+    """Stand in for _iter_chunks, recording whether the reader was closed"""
+    state = {"closed": False}
+
+    async def fake_iter_chunks():
+        try:
+            for number in range(count):
+                yield number
+        finally:
+            state["closed"] = True
+
+    monkeypatch.setattr(healthcare_etl, "_iter_chunks", fake_iter_chunks)
+    return state
+
+
+def test_cancelled_producer_does_not_block_on_a_full_queue(
+    healthcare_etl, monkeypatch
+):
+    state = tracked_chunks(healthcare_etl, monkeypatch, count=5)
+    monkeypatch.setattr(healthcare_etl, "clean_data", lambda chunk: chunk)
+
+    async def run():
+        queue = asyncio.Queue(maxsize=1)
+        producer = asyncio.create_task(healthcare_etl._produce_chunks(queue))
+        while not queue.full():
+            await asyncio.sleep(0.01)
+        producer.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(producer, timeout=1)
+
+    asyncio.run(run())
+
+    assert state["closed"]
+
+
+def test_failed_producer_stops_the_consumer(healthcare_etl, monkeypatch):
+    state = tracked_chunks(healthcare_etl, monkeypatch, count=5)
+
+    def failing_clean_data(chunk):
+        raise ValueError("bad chunk")
+
+    monkeypatch.setattr(healthcare_etl, "clean_data", failing_clean_data)
+
+    async def run():
+        queue = asyncio.Queue(maxsize=1)
+        with pytest.raises(ValueError):
+            await healthcare_etl._produce_chunks(queue)
+        return queue.get_nowait()
+
+    assert asyncio.run(run()) is None
+    assert state["closed"]
+
+
+class FakeNominatim:
+    def __init__(self, **kwargs):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def geocode(self, query):
+        raise AssertionError("geocode is replaced by the fake rate limiter")
+
+
+def test_geocode_providers_sends_only_misses_to_a_bounded_pool(
+    healthcare_etl, monkeypatch, tmp_path
+):
+    cache_path = str(tmp_path / "geocode_cache")
+    with etl.shelve.open(cache_path) as cache:
+        cache["10001"] = (40.75, -73.99)
+    calls = []
+    running = 0
+    peak = 0
+
+    async def fake_geocode(query):
+        nonlocal running, peak
+        calls.append(query)
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        if query.startswith("99999"):
+            raise ValueError("service unavailable")
+        return SimpleNamespace(latitude=1.0, longitude=2.0)
+
+    monkeypatch.setattr(etl, "GEOCODE_CACHE_PATH", cache_path)
+    monkeypatch.setattr(etl, "Nominatim", FakeNominatim)
+    monkeypatch.setattr(etl, "AsyncRateLimiter", lambda func, **kw: fake_geocode)
+    zips = ["10001", "99999", *(f"2{n:04d}" for n in range(10))]
+    df = pd.DataFrame({"provider_zip_code": pd.array(zips, dtype="string")})
+
+    geocoded = asyncio.run(healthcare_etl.geocode_providers(df))
+
+    assert len(calls) == len(zips) - 1
+    assert "10001, USA" not in calls
+    assert peak <= etl.GEOCODE_WORKERS
+    coordinates = geocoded.set_index("provider_zip_code")
+    assert coordinates.loc["10001", "latitude"] == 40.75
+    assert coordinates.loc["20000", "longitude"] == 2.0
+    assert pd.isna(coordinates.loc["99999", "latitude"])
+    with etl.shelve.open(cache_path) as cache:
+        # Errors are retried next run rather than cached as a miss
+        assert "99999" not in cache
+        assert cache["20009"] == (1.0, 2.0)
+
+
+def test_providers_drg_trigram_index_is_rebuilt_after_fast_load():
+    index = next(
+        index
+        for index in etl._deferrable_indexes(etl.Provider.__table__)
+        if index.name == "ix_providers_drg_trgm"
+    )
+
+    ddl = str(CreateIndex(index).compile(dialect=postgresql.dialect()))
+    assert "USING gin (ms_drg_definition gin_trgm_ops)" in ddl
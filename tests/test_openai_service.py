@@ -0,0 +1,139 @@
+import asyncio
+
+import pytest
+
+from services import openai_service
+
+
+def classify(monkeypatch, ai_response: str) -> dict:
+    async def fake_stream(question):
+        return ai_response
+
+    monkeypatch.setattr(openai_service, "stream_until_actionable", fake_stream)
+    return asyncio.run(openai_service.classify_and_process_query("question"))
+
+
+@pytest.mark.parametrize(
+    "ai_response, expected_sql",
+    [
+        (
+            'PARAMS: {"keyword": "%knee%"}\n'
+            "SELECT provider_name FROM providers WHERE ms_drg_definition "
+            "ILIKE :keyword;",
+            "SELECT provider_name FROM providers WHERE ms_drg_definition "
+            "ILIKE :keyword",
+        ),
+        (
+            "```sql\nSELECT provider_name\nFROM providers\n```\n"
+            "This lists every provider.",
+            "SELECT provider_name\nFROM providers",
+        ),
+        (
+            "SELECT provider_id FROM providers\n\nUNION ALL\n\n"
+            "SELECT provider_id FROM ratings;",
+            "SELECT provider_id FROM providers\n\nUNION ALL\n\n"
+            "SELECT provider_id FROM ratings",
+        ),
+    ],
+)
+def test_sql_extraction_stops_at_terminators_only(
+    monkeypatch, ai_response, expected_sql
+):
+    analysis = classify(monkeypatch, ai_response)
+
+    assert analysis["type"] == "sql_query"
+    assert analysis["sql"] == expected_sql
+
+
+def test_params_line_is_parsed(monkeypatch):
+    analysis = classify(
+        monkeypatch,
+        'PARAMS: {"keyword": "%knee%"}\nSELECT 1 FROM providers '
+        "WHERE ms_drg_definition ILIKE :keyword;",
+    )
+
+    assert analysis["params"] == {"keyword": "%knee%"}
+
+
+def sql_analysis(sql: str, params: dict) -> dict:
+    return {"type": "sql_query", "sql": sql, "params": params}
+
+
+CANONICAL = openai_service.CHEAPEST_BY_DRG_SQL
+
+
+@pytest.mark.parametrize(
+    "sql, params",
+    [
+        (CANONICAL, {"drg_prefix": "470%"}),
+        (CANONICAL.lower() + ";", {"drg_prefix": "470%"}),
+        (
+            "SELECT provider_name, average_covered_charges FROM providers "
+            "WHERE ms_drg_definition ILIKE :drg ORDER BY average_covered_charges ASC "
+            "LIMIT 10",
+            {"drg": "470%"},
+        ),
+    ],
+)
+def test_cheapest_drg_confirmed_for_canonical_shape(sql, params):
+    assert openai_service.confirms_cheapest_drg(sql_analysis(sql, params), "470")
+
+
+@pytest.mark.parametrize(
+    "sql, params",
+    [
+        # Extra filter
+        (
+            CANONICAL.replace(
+                "LIKE :drg_prefix", "LIKE :drg_prefix AND provider_state = :state"
+            ),
+            {"drg_prefix": "470%", "state": "NY"},
+        ),
+        # Most expensive first
+        (
+            CANONICAL.replace(
+                "average_covered_charges\nLIMIT", "average_covered_charges DESC\nLIMIT"
+            ),
+            {"drg_prefix": "470%"},
+        ),
+        # Different limit
+        (CANONICAL.replace("LIMIT 10", "LIMIT 5"), {"drg_prefix": "470%"}),
+        # Different DRG, or a contains-match rather than a prefix
+        (CANONICAL, {"drg_prefix": "871%"}),
+        (CANONICAL, {"drg_prefix": "%470%"}),
+        # No cost column to rank on in the answer
+        (
+            CANONICAL.replace(", average_covered_charges\nFROM", "\nFROM"),
+            {"drg_prefix": "470%"},
+        ),
+    ],
+)
+def test_cheapest_drg_rejected_for_other_queries(sql, params):
+    assert not openai_service.confirms_cheapest_drg(sql_analysis(sql, params), "470")
+
+
+def test_speculative_rows_used_only_when_confirmed(monkeypatch):
+    executed = []
+
+    async def fake_classify(question):
+        return sql_analysis(
+            CANONICAL.replace("LIMIT 10", "LIMIT 5"), {"drg_prefix": "470%"}
+        )
+
+    async def fake_execute(db, sql_query, params=None):
+        executed.append(sql_query)
+        return [{"provider_name": "Bellevue", "average_covered_charges": 1.0}]
+
+    monkeypatch.setattr(openai_service, "classify_and_process_query", fake_classify)
+    monkeypatch.setattr(openai_service, "execute_custom_query", fake_execute)
+    openai_service.classification_cache._entries.clear()
+    openai_service.query_result_cache._entries.clear()
+
+    asyncio.run(
+        openai_service.process_natural_language_query(
+            "Cheapest hospitals for DRG 470?", db=None
+        )
+    )
+
+    # The speculative canonical query ran, but so did the model's own
+    assert executed == [CANONICAL, CANONICAL.replace("LIMIT 10", "LIMIT 5")]
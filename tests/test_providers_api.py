@@ -0,0 +1,53 @@
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+import main
+from database import get_async_db
+from services import search_service
+
+
+async def fake_db():
+    yield None
+
+
+def test_providers_route_returns_search_results(monkeypatch):
+    seen = {}
+    provider = SimpleNamespace(
+        provider_id="330123",
+        provider_name="Bellevue",
+        provider_city="New York",
+        provider_state="NY",
+        provider_zip_code="10016",
+        ms_drg_definition="470 - MAJOR JOINT REPLACEMENT",
+        total_discharges=156,
+        average_covered_charges=45230.5,
+        average_total_payments=20000.0,
+        average_medicare_payments=18000.0,
+    )
+
+    async def fake_search(db, drg, latitude, longitude, radius_km, limit):
+        seen.update(drg=drg, latitude=latitude, limit=limit)
+        return [(provider, None, 8.24)]
+
+    monkeypatch.setattr(
+        search_service, "get_providers_by_drg_and_location", fake_search
+    )
+    main.app.dependency_overrides[get_async_db] = fake_db
+    try:
+        response = TestClient(main.app).get("/providers?drg=470&limit=5")
+    finally:
+        main.app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["total_count"] == 1
+    assert body["hospitals"][0]["provider_name"] == "Bellevue"
+    assert body["hospitals"][0]["average_rating"] == 8.2
+    assert seen == {"drg": "470", "latitude": None, "limit": 5}
+
+
+def test_providers_route_rejects_oversized_limit():
+    response = TestClient(main.app).get("/providers?limit=1000")
+
+    assert response.status_code == 422
@@ -0,0 +1,73 @@
+import asyncio
+import time
+
+from services import search_service
+
+
+class CountingGeocodingService(search_service.GeocodingService):
+    """Geocodes from a fixed table, recording each Nominatim call"""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = []
+
+    def _geocode_zip(self, zip_code):
+        self.calls.append((zip_code, time.monotonic()))
+        time.sleep(0.01)
+        return {"10001": (40.75, -73.99), "10032": (40.84, -73.94)}.get(zip_code)
+
+
+def test_cache_hits_stay_on_the_event_loop(monkeypatch):
+    service = CountingGeocodingService()
+
+    async def lookups():
+        await service.get_coordinates_from_zip("10001")
+
+        async def no_thread(*args):
+            raise AssertionError("cache hit went to a worker thread")
+
+        monkeypatch.setattr(search_service.asyncio, "to_thread", no_thread)
+        return await service.get_coordinates_from_zip("10001-1234")
+
+    assert asyncio.run(lookups()) == (40.75, -73.99)
+    assert len(service.calls) == 1
+
+
+def test_concurrent_lookups_share_one_request_per_zip(monkeypatch):
+    monkeypatch.setattr(search_service, "NOMINATIM_MIN_DELAY_SECONDS", 0.05)
+    service = CountingGeocodingService()
+
+    async def lookups():
+        return await asyncio.gather(
+            *(service.get_coordinates_from_zip(z) for z in ["10001"] * 5 + ["10032"])
+        )
+
+    results = asyncio.run(lookups())
+
+    assert results == [(40.75, -73.99)] * 5 + [(40.84, -73.94)]
+    assert [zip_code for zip_code, _ in service.calls] == ["10001", "10032"]
+    # Requests are serialized and spaced by the policy delay
+    assert service.calls[1][1] - service.calls[0][1] >= 0.05
+
+
+def test_not_found_is_cached_but_errors_are_retried(monkeypatch):
+    monkeypatch.setattr(search_service, "NOMINATIM_MIN_DELAY_SECONDS", 0.0)
+    service = CountingGeocodingService()
+    attempts = []
+
+    def flaky_geocode(zip_code):
+        attempts.append(zip_code)
+        if len(attempts) == 1:
+            raise search_service.GeocoderServiceError("down")
+        return None
+
+    service._geocode_zip = flaky_geocode
+
+    async def lookups():
+        first = await service.get_coordinates_from_zip("99999")
+        second = await service.get_coordinates_from_zip("99999")
+        third = await service.get_coordinates_from_zip("99999")
+        return first, second, third
+
+    assert asyncio.run(lookups()) == (None, None, None)
+    assert attempts == ["99999", "99999"]
@@ -0,0 +1,70 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from database import get_db
+
+
+def fake_db():
+    yield None
+
+
+@pytest.fixture
+def client():
+    main.app.dependency_overrides[get_db] = fake_db
+    try:
+        yield TestClient(main.app)
+    finally:
+        main.app.dependency_overrides.clear()
+
+
+def upload(client, header):
+    body = ",".join(header) + "\n"
+    return client.post("/upload-csv/", files={"file": ("data.csv", body.encode())})
+
+
+@pytest.fixture
+def recorded_backend(monkeypatch):
+    used = []
+    monkeypatch.setattr(main, "copy_csv", lambda file: used.append("copy") or 0)
+    monkeypatch.setattr(
+        main, "insert_csv", lambda file, db: used.append("insert") or 0
+    )
+    monkeypatch.setattr(
+        main, "adbc_copy_csv", lambda file: used.append("adbc") or 0
+    )
+    return used
+
+
+def test_unknown_header_column_is_a_bad_request(client, recorded_backend):
+    header = main.PROVIDER_DATA_HEADER[:-1] + ["Unexpected Column"]
+    response = upload(client, header)
+
+    assert response.status_code == 400
+    assert "Unexpected Column" in response.json()["detail"]
+    assert recorded_backend == []
+
+
+def test_reordered_header_is_a_bad_request(client, recorded_backend):
+    header = list(reversed(main.PROVIDER_DATA_HEADER))
+    response = upload(client, header)
+
+    assert response.status_code == 400
+    assert "order" in response.json()["detail"]
+    assert recorded_backend == []
+
+
+def test_copy_is_the_default_backend(client, recorded_backend):
+    response = upload(client, main.PROVIDER_DATA_HEADER)
+
+    assert response.status_code == 200
+    assert main.UPLOAD_BACKEND == "copy"
+    assert recorded_backend == ["copy"]
+
+
+def test_insert_backend_is_selectable(client, recorded_backend, monkeypatch):
+    monkeypatch.setattr(main, "UPLOAD_BACKEND", "insert")
+    response = upload(client, main.PROVIDER_DATA_HEADER)
+
+    assert response.status_code == 200
+    assert recorded_backend == ["insert"]